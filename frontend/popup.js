@@ -154,27 +154,65 @@ const renderResults = (suggestions) => {
     return;
   }
 
-  suggestions.forEach((item) => {
-    const container = document.createElement("article");
-    container.className = "suggestion";
-
-    const heading = document.createElement("a");
-    heading.href = item.url;
-    heading.target = "_blank";
-    heading.rel = "noopener noreferrer";
-    heading.textContent = item.title;
-
-    const reason = document.createElement("p");
-    reason.textContent = item.reason;
-
-    const score = document.createElement("p");
-    score.className = "score";
-    score.textContent = `Confidence: ${(item.score * 100).toFixed(0)}%`;
-
-    container.append(heading, reason, score);
-    resultsEl.appendChild(container);
-    chrome.tabs.create({ url: item.url });
-  });
+  suggestions.forEach(renderSuggestion);
+};
+
+const renderSuggestion = (item) => {
+  const container = document.createElement("article");
+  container.className = "suggestion";
+
+  const heading = document.createElement("a");
+  heading.href = item.url;
+  heading.target = "_blank";
+  heading.rel = "noopener noreferrer";
+  heading.textContent = item.title;
+
+  const reason = document.createElement("p");
+  reason.textContent = item.reason;
+
+  const score = document.createElement("p");
+  score.className = "score";
+  score.textContent = `Confidence: ${(item.score * 100).toFixed(0)}%`;
+
+  container.append(heading, reason, score);
+  resultsEl.appendChild(container);
+  chrome.tabs.create({ url: item.url });
+};
+
+// Reads the newline-delimited JSON body of /tabs/stream, handing each
+// suggestion to `onSuggestion` as soon as its line arrives. Returns the
+// message of a trailing error line, if the server sent one.
+const readSuggestionStream = async (response, onSuggestion) => {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+  let streamError = null;
+
+  const handleLine = (line) => {
+    if (!line.trim()) {
+      return;
+    }
+    const item = JSON.parse(line);
+    if (item.error) {
+      streamError = item.error;
+      return;
+    }
+    onSuggestion(item);
+  };
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      break;
+    }
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split("\n");
+    buffered = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffered + decoder.decode());
+
+  return streamError;
 };
 
 const parseNumericInput = (inputEl, fallback, min, max) => {
@@ -214,12 +252,12 @@ const handleSubmit = async (event) => {
     }
 
     const limit = parseNumericInput(limitEl, 5, 1, 10);
-    const temperature = parseNumericInput(tempEl, 0.2, 0, 2);
+    const temperature = parseNumericInput(tempEl, 0, 0, 2);
 
     setStatus("Requesting tab plan from server…");
 
     const response = await fetch(
-      `https://hackathon.sobel.club/tabs?limit=${encodeURIComponent(
+      `https://hackathon.sobel.club/tabs/stream?limit=${encodeURIComponent(
         limit
       )}&temperature=${encodeURIComponent(temperature)}`,
       {
@@ -244,8 +282,11 @@ const handleSubmit = async (event) => {
       throw new Error(message);
     }
 
-    const payload = await response.json();
-    renderResults(payload.tabs);
+    resultsEl.replaceChildren();
+    const streamError = await readSuggestionStream(response, renderSuggestion);
+    if (streamError) {
+      throw new Error(streamError);
+    }
     setStatus("Tab plan ready. Review the suggestions below.");
   } catch (error) {
     const message =
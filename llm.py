@@ -9,39 +9,64 @@ be opened for a particular prompt.
 
 from __future__ import annotations
 
-import json
+import asyncio
 import os
-from dataclasses import dataclass
-from pydantic import BaseModel, HttpUrl, ValidationError
-from openai import AsyncOpenAI
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Mapping, Sequence
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Annotated, Protocol
+
+import httpx
+import orjson
+from pydantic import AfterValidator, BaseModel, Field, TypeAdapter, ValidationError
+from openai import AsyncOpenAI, NotFoundError
+
+from scoring import prefilter
 
 DEFAULT_MODEL = os.getenv("TAB_PLANNER_OPENAI_MODEL", "gpt-4.1-mini")
+DEFAULT_TEMPERATURE = 0.0
+
+# Output length dominates latency, so completions are capped at a generous
+# per-tab envelope. The stop sequence guards against JSON mode padding its
+# answer with runs of blank lines.
+OUTPUT_TOKENS_PER_TAB = 100
+OUTPUT_TOKENS_OVERHEAD = 20
+# Room for the `{"request": N, "tabs": [...]}` wrapper of each batched answer.
+OUTPUT_TOKENS_PER_BATCH_ANSWER = 20
+# Never ask for more than the output limit of the smaller supported models.
+OUTPUT_TOKENS_MAX = 16384
+STOP_SEQUENCES = ["\n\n\n"]
+
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=500)
+HTTP_TIMEOUT = httpx.Timeout(60.0)
+
+# Tags batch jobs submitted by this app, so that only those can be looked up.
+BATCH_METADATA_SOURCE = "tab_planner"
+
+BATCH_WINDOW_SECONDS = 0.02
+BATCH_MAX_SIZE = 10
 
-RESPONSE_SCHEMA = {
-    "name": "tab_plan",
-    "strict": True,
-    "schema": {
-        "type": "object",
-        "additionalProperties": False,
-        "properties": {
-            "tabs": {
-                "type": "array",
-                "items": {
-                    "type": "object",
-                    "additionalProperties": False,
-                    "properties": {
-                        "title": {"type": "string"},
-                        "url": {"type": "string"},
-                        "reason": {"type": "string"},
-                        "score": {"type": "number", "minimum": 0, "maximum": 1},
-                    },
-                    "required": ["title", "url", "reason", "score"],
-                },
-            }
-        },
-        "required": ["tabs"],
-    },
-}
+RESPONSE_CACHE_TTL_SECONDS = 3600.0
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+RESPONSE_CACHE_MAX_TEMPERATURE = 0.3
+
+# Libraries up to this size are sent whole, so their bookmarks block (and
+# with it the cacheable prompt prefix) is the same for every prompt. It sits
+# above the extension's 200-bookmark cap. Larger libraries are shortlisted per
+# prompt, which gives up prefix caching in exchange for a much shorter prompt.
+PREFILTER_MAX_BOOKMARKS = 250
+PREFILTER_MIN_CANDIDATES = 50
+PREFILTER_CANDIDATES_PER_TAB = 4
+# Preparing a library that is sent whole takes about 0.5 ms, far less than a
+# worker thread round trip buys back. Building the BM25 index for a library
+# that gets shortlisted takes 7 ms and more (17 ms at 500, 170 ms at 5000
+# bookmarks), so those are prepared off the event loop.
+PREPARE_IN_THREAD_MIN_BOOKMARKS = PREFILTER_MAX_BOOKMARKS + 1
 
 SYSTEM_PROMPT = """You are a research assistant tasked with helping a user decide
 which saved bookmarks to open in new browser tabs for their current task.
@@ -50,28 +75,55 @@ General rules:
 - Only choose from the bookmarks provided. Do not invent new URLs.
 - Choose the smallest set of tabs that still covers the user's intent.
 - Prioritize relevance to the prompt, freshness implied by the prompt, and topic coverage.
-- Provide a concise reason for each selection. Mention why the bookmark helps.
+- Provide a concise, single-sentence reason for each selection. Mention why the bookmark helps.
 - Provide a confidence score between 0 and 1. Use higher scores for better matches.
-- Return answers strictly as JSON that matches the provided schema with a top-level `tabs` array.
+- Return answers strictly as a JSON object of the form
+  {"tabs": [{"title": string, "url": string, "reason": string, "score": number}]}
+  with no other top-level keys.
+"""
+
+BATCH_SYSTEM_PROMPT = (
+    SYSTEM_PROMPT
+    + """
+You may be given several independent requests at once, each wrapped in
+<request N> tags. Answer every request using only the bookmarks listed inside it,
+and instead of a single `tabs` array return
+  {"answers": [{"request": N, "tabs": [...]}]}
+with exactly one entry per request.
 """
+)
+
+
+_HTTP_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
 
 
-class BookmarkPayload(BaseModel):
+def _check_http_url(value: str) -> str:
+    if _HTTP_URL_RE.fullmatch(value) is None:
+        raise ValueError("URL must be an absolute http:// or https:// address.")
+    return value
+
+
+# A plain string with a cheap shape check. Pydantic's HttpUrl fully parses
+# every URL, which is costly for requests carrying hundreds of bookmarks.
+HttpUrlStr = Annotated[str, AfterValidator(_check_http_url)]
+
+
+class Bookmark(BaseModel):
     title: str
-    url: HttpUrl
+    url: HttpUrlStr
     tags: list[str] | None = None
     description: str | None = None
 
 
-class BrowsingHistoryPayload(BaseModel):
+class HistoryEntry(BaseModel):
     title: str
-    url: HttpUrl
+    url: HttpUrlStr
     last_visited: str | None = None
 
 
-class OpenTabPayload(BaseModel):
+class OpenTab(BaseModel):
     title: str
-    url: HttpUrl
+    url: HttpUrlStr
     opened_at: str | None = None
     pinned: bool | None = None
 
@@ -79,40 +131,130 @@ class OpenTabPayload(BaseModel):
 @dataclass(frozen=True)
 class TabSuggestion:
     title: str
-    url: HttpUrl
-    reason: str
-    score: float
+    url: HttpUrlStr
+    reason: str = "No reason provided."
+    score: Annotated[float, Field(ge=0, le=1)] = 0.5
+
+
+_TAB_SUGGESTION_ADAPTER = TypeAdapter(TabSuggestion)
 
 
 class LLMSuggestionError(RuntimeError):
     """Raised when the language model could not produce a usable response."""
 
 
-def _get_client():
+class TabBatchNotFoundError(LookupError):
+    """Raised when a batch id does not name a batch submitted by this app."""
+
+
+class ResponseCache:
+    """
+    In-process LRU cache of tab suggestions with a per-entry time to live.
+
+    All access happens on the event loop thread without awaiting in between,
+    so no locking is required.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, tuple[TabSuggestion, ...]]] = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def make_key(*, model: str, temperature: float, user_message: str) -> str:
+        digest = blake2b(digest_size=16)
+        digest.update(orjson.dumps([model, temperature, user_message]))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> list[TabSuggestion] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, suggestions = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return list(suggestions)
+
+    def set(self, key: str, suggestions: list[TabSuggestion]) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, tuple(suggestions))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_RESPONSE_CACHE = ResponseCache()
+
+
+@lru_cache(maxsize=1)
+def get_shared_client() -> AsyncOpenAI:
+    """
+    Return the process-wide OpenAI client.
+
+    The client is built on first use and reused afterwards so that concurrent
+    requests share one pooled, keep-alive HTTP connection pool.
+    """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise LLMSuggestionError(
             "Missing OPENAI_API_KEY environment variable; cannot call the language model."
         )
-    return AsyncOpenAI(api_key=api_key)
+    return AsyncOpenAI(
+        api_key=api_key,
+        http_client=httpx.AsyncClient(limits=HTTP_POOL_LIMITS, timeout=HTTP_TIMEOUT),
+    )
 
 
-def _build_user_message(
-    prompt: str,
-    bookmarks: list[BookmarkPayload],
-    max_tabs: int,
-    history: list[BrowsingHistoryPayload] | None = None,
-    open_tabs: list[OpenTabPayload] | None = None,
+async def close_shared_client() -> None:
+    """Close the shared client's connection pool, if it was ever created."""
+    if get_shared_client.cache_info().currsize:
+        client = get_shared_client()
+        get_shared_client.cache_clear()
+        await client.close()
+
+
+@lru_cache(maxsize=1024)
+def _format_bookmark_line(
+    title: str,
+    url: str,
+    tags: tuple[str, ...] | None,
+    description: str | None,
+) -> str:
+    tags_text = f" | tags: {', '.join(tags)}" if tags else ""
+    description_text = f"\n    description: {description}" if description else ""
+    return f"{title}\n    url: {url}{tags_text}{description_text}"
+
+
+def _build_context(
+    bookmarks: list[Bookmark],
+    history: list[HistoryEntry] | None = None,
+    open_tabs: list[OpenTab] | None = None,
 ) -> str:
+    # Stable content goes first and the prompt last so that repeated requests
+    # over the same bookmark library share a cacheable prompt prefix. Sorting
+    # keeps the prefix independent of the order the client sent bookmarks in.
+    ordered_bookmarks = sorted(bookmarks, key=lambda bookmark: bookmark.url)
+
     bookmark_lines = []
-    for index, bookmark in enumerate(bookmarks, start=1):
-        tags_text = f" | tags: {', '.join(bookmark.tags)}" if bookmark.tags else ""
-        description_text = (
-            f"\n    description: {bookmark.description}" if bookmark.description else ""
-        )
-        bookmark_lines.append(
-            f"{index}. {bookmark.title}\n    url: {bookmark.url}{tags_text}{description_text}"
+    for index, bookmark in enumerate(ordered_bookmarks, start=1):
+        bookmark_line = _format_bookmark_line(
+            bookmark.title,
+            bookmark.url,
+            tuple(bookmark.tags) if bookmark.tags else None,
+            bookmark.description,
         )
+        bookmark_lines.append(f"{index}. {bookmark_line}")
 
     bookmarks_block = (
         "\n".join(bookmark_lines) if bookmark_lines else "No bookmarks supplied."
@@ -144,25 +286,641 @@ def _build_user_message(
         open_tabs_block = "\n".join(open_tab_lines)
 
     return (
-        "User prompt:\n"
-        f"{prompt.strip()}\n\n"
+        "Choose bookmarks for the user's prompt, which is given at the end. "
+        "You may reference history or existing tabs when explaining your choices.\n\n"
         f"Bookmarks:\n{bookmarks_block}\n\n"
         f"Recent history entries:\n{history_block}\n\n"
         f"Currently open tabs:\n{open_tabs_block}\n\n"
-        f"Select up to {max_tabs} bookmarks that best satisfy the user's prompt. "
-        "You may reference history or existing tabs when explaining your choices."
     )
 
 
+def _build_user_message(context: str, prompt: str, max_tabs: int) -> str:
+    return (
+        f"{context}User prompt:\n"
+        f"{prompt.strip()}\n\n"
+        f"Select up to {max_tabs} bookmarks that best satisfy the user's prompt."
+    )
+
+
+@dataclass(frozen=True)
+class _PreparedRequest:
+    user_message: str
+    # Everything the message says besides the prompt. Only calls with the
+    # same context are micro-batched, so a shared completion never mixes
+    # different users' bookmarks, history or tabs.
+    context: str
+    # The bookmarks offered to the model, by URL; suggestions must name one.
+    offered: Mapping[str, Bookmark]
+
+
+def _prepare_user_message(
+    prompt: str,
+    bookmarks: list[Bookmark],
+    max_tabs: int,
+    history: list[HistoryEntry] | None = None,
+    open_tabs: list[OpenTab] | None = None,
+) -> _PreparedRequest:
+    cleaned_prompt = prompt.strip()
+    if not cleaned_prompt:
+        raise ValueError("Prompt must not be empty.")
+
+    if not bookmarks:
+        raise ValueError("At least one bookmark must be provided.")
+
+    if max_tabs <= 0:
+        raise ValueError("max_tabs must be greater than zero.")
+
+    shortlist = bookmarks
+    if len(bookmarks) > PREFILTER_MAX_BOOKMARKS:
+        shortlist = prefilter(
+            cleaned_prompt,
+            bookmarks,
+            k=max(PREFILTER_MIN_CANDIDATES, PREFILTER_CANDIDATES_PER_TAB * max_tabs),
+        )
+    context = _build_context(shortlist, history=history, open_tabs=open_tabs)
+    return _PreparedRequest(
+        user_message=_build_user_message(context, cleaned_prompt, max_tabs),
+        context=context,
+        offered={bookmark.url: bookmark for bookmark in shortlist},
+    )
+
+
+async def _prepare_user_message_async(
+    prompt: str,
+    bookmarks: list[Bookmark],
+    max_tabs: int,
+    history: list[HistoryEntry] | None = None,
+    open_tabs: list[OpenTab] | None = None,
+) -> _PreparedRequest:
+    if len(bookmarks) >= PREPARE_IN_THREAD_MIN_BOOKMARKS:
+        # Indexing and formatting a large library takes long enough to stall
+        # other requests, so it runs in a worker thread instead.
+        return await asyncio.to_thread(
+            _prepare_user_message,
+            prompt,
+            bookmarks,
+            max_tabs,
+            history=history,
+            open_tabs=open_tabs,
+        )
+    return _prepare_user_message(
+        prompt, bookmarks, max_tabs, history=history, open_tabs=open_tabs
+    )
+
+
+def _cache_key(model: str, temperature: float, user_message: str) -> str | None:
+    # Higher temperatures are expected to vary between calls, so only fairly
+    # deterministic requests are served from the cache.
+    if temperature > RESPONSE_CACHE_MAX_TEMPERATURE:
+        return None
+    return ResponseCache.make_key(
+        model=model, temperature=temperature, user_message=user_message
+    )
+
+
+def _offered_suggestion(
+    suggestion: TabSuggestion, offered: Mapping[str, Bookmark]
+) -> TabSuggestion | None:
+    bookmark = offered.get(suggestion.url)
+    if bookmark is None:
+        # Anything outside the offered bookmarks is invented by the model.
+        return None
+    # Echo the caller's own title instead of whatever text the model wrote.
+    return replace(suggestion, title=bookmark.title)
+
+
+def _parse_suggestions(
+    tabs_data: object,
+    max_tabs: int | None,
+    offered: Mapping[str, Bookmark] | None = None,
+) -> list[TabSuggestion]:
+    if not isinstance(tabs_data, list):
+        raise LLMSuggestionError(
+            "Language model response did not include a 'tabs' list."
+        )
+
+    suggestions: list[TabSuggestion] = []
+    for item in tabs_data:
+        if not isinstance(item, dict):
+            continue
+        # The decoded item is validated as-is; missing `reason`/`score` fall
+        # back to the dataclass defaults and unknown keys are ignored.
+        try:
+            suggestion = _TAB_SUGGESTION_ADAPTER.validate_python(item)
+        except ValidationError:
+            continue
+        if offered is not None:
+            suggestion = _offered_suggestion(suggestion, offered)
+            if suggestion is None:
+                continue
+        suggestions.append(suggestion)
+
+    return suggestions[:max_tabs]
+
+
+def _max_output_tokens(max_tabs: int) -> int:
+    return min(
+        max_tabs * OUTPUT_TOKENS_PER_TAB + OUTPUT_TOKENS_OVERHEAD, OUTPUT_TOKENS_MAX
+    )
+
+
+def _max_batch_output_tokens(max_tabs: Sequence[int]) -> int:
+    return min(
+        sum(
+            count * OUTPUT_TOKENS_PER_TAB + OUTPUT_TOKENS_PER_BATCH_ANSWER
+            for count in max_tabs
+        )
+        + OUTPUT_TOKENS_OVERHEAD,
+        OUTPUT_TOKENS_MAX,
+    )
+
+
+async def _complete_json(
+    client: AsyncOpenAI,
+    *,
+    model: str,
+    temperature: float,
+    system_prompt: str,
+    user_message: str,
+    max_tokens: int,
+    list_key: str,
+) -> dict:
+    """
+    Run a non-streamed JSON-mode completion and decode its object.
+
+    When the answer was cut off by `max_tokens`, the complete objects of its
+    top-level `list_key` array are recovered instead of failing outright.
+    """
+    try:
+        response = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stop=STOP_SEQUENCES,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message},
+            ],
+        )
+    except Exception as exc:  # noqa: BLE001 - bubble up as domain-specific error
+        raise LLMSuggestionError(f"OpenAI API request failed: {exc}") from exc
+
+    if not response.choices:
+        raise LLMSuggestionError("Language model returned no choices.")
+
+    choice = response.choices[0]
+    message = choice.message
+    if message is None or message.content is None:
+        raise LLMSuggestionError("Language model returned an empty message.")
+
+    try:
+        payload = orjson.loads(message.content)
+    except orjson.JSONDecodeError as exc:
+        if choice.finish_reason == "length":
+            return {list_key: _TabObjectScanner(list_key).feed(message.content)}
+        raise LLMSuggestionError("Language model response was not valid JSON.") from exc
+
+    if not isinstance(payload, dict):
+        raise LLMSuggestionError("Language model response was not a JSON object.")
+    return payload
+
+
+class _TabObjectScanner:
+    """
+    Pick complete suggestion objects out of a partially streamed response.
+
+    Expects the `{"tabs": [{...}, ...]}` shape requested by SYSTEM_PROMPT and
+    tracks bracket depth (ignoring brackets inside strings) so that each item
+    can be decoded as soon as its closing brace arrives. Only objects directly
+    inside the top-level `key` array count as items.
+    """
+
+    def __init__(self, key: str = "tabs") -> None:
+        self._key = key
+        self._buffer: list[str] = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._top_is_object = False
+        self._key_start: int | None = None
+        self._last_key: str | None = None
+        self._in_tabs = False
+        self._item_start: int | None = None
+
+    def feed(self, text: str) -> list[dict]:
+        items: list[dict] = []
+        for char in text:
+            self._buffer.append(char)
+            position = self._length
+            self._length += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        key = self._buffer[self._key_start : position]
+                        self._last_key = "".join(key)
+                        self._key_start = None
+            elif char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    # Remember top-level strings; the last one before an array
+                    # opens is that array's key.
+                    self._key_start = position + 1
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._top_is_object = char == "{"
+                elif self._depth == 2:
+                    self._in_tabs = (
+                        char == "["
+                        and self._top_is_object
+                        and self._last_key == self._key
+                    )
+                elif self._depth == 3 and char == "{" and self._in_tabs:
+                    self._item_start = position
+            elif char in "}]":
+                if self._depth == 3 and char == "}" and self._item_start is not None:
+                    item = self._decode(self._item_start)
+                    if item is not None:
+                        items.append(item)
+                    self._item_start = None
+                elif self._depth == 2:
+                    self._in_tabs = False
+                self._depth -= 1
+        return items
+
+    def _decode(self, start: int) -> dict | None:
+        try:
+            item = orjson.loads("".join(self._buffer[start:]))
+        except orjson.JSONDecodeError:
+            return None
+        return item if isinstance(item, dict) else None
+
+
+async def _stream_tab_items(
+    client: AsyncOpenAI,
+    *,
+    model: str,
+    temperature: float,
+    user_message: str,
+    max_tabs: int,
+) -> AsyncIterator[dict]:
+    """
+    Stream a single-request completion, yielding raw suggestion objects.
+
+    Each item is yielded as soon as its closing brace arrives. Closing the
+    generator early closes the underlying stream, which stops the model from
+    generating items that would be discarded anyway.
+    """
+    try:
+        stream = await client.chat.completions.create(
+            model=model,
+            temperature=temperature,
+            max_tokens=_max_output_tokens(max_tabs),
+            stop=STOP_SEQUENCES,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_message},
+            ],
+            stream=True,
+        )
+    except Exception as exc:  # noqa: BLE001 - bubble up as domain-specific error
+        raise LLMSuggestionError(f"OpenAI API request failed: {exc}") from exc
+
+    scanner = _TabObjectScanner()
+    received = 0
+    chunks: list[str] = []
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if not content:
+                continue
+            chunks.append(content)
+            for item in scanner.feed(content):
+                received += 1
+                yield item
+    except Exception as exc:  # noqa: BLE001 - bubble up as domain-specific error
+        raise LLMSuggestionError(f"OpenAI API request failed: {exc}") from exc
+    finally:
+        await stream.close()
+
+    # Items already streamed are kept even when the full text does not parse,
+    # e.g. because the answer was cut off by the output cap.
+    if received:
+        return
+
+    if not chunks:
+        raise LLMSuggestionError("Language model returned an empty message.")
+
+    try:
+        payload = orjson.loads("".join(chunks))
+    except orjson.JSONDecodeError as exc:
+        raise LLMSuggestionError("Language model response was not valid JSON.") from exc
+
+    if not isinstance(payload, dict):
+        raise LLMSuggestionError("Language model response was not a JSON object.")
+
+    tabs_data = payload.get("tabs")
+    if not isinstance(tabs_data, list):
+        raise LLMSuggestionError(
+            "Language model response did not include a 'tabs' list."
+        )
+    for item in tabs_data:
+        if isinstance(item, dict):
+            yield item
+
+
+async def _stream_suggestions(
+    client: AsyncOpenAI,
+    *,
+    model: str,
+    temperature: float,
+    user_message: str,
+    max_tabs: int,
+    offered: Mapping[str, Bookmark],
+) -> AsyncIterator[TabSuggestion]:
+    items = _stream_tab_items(
+        client,
+        model=model,
+        temperature=temperature,
+        user_message=user_message,
+        max_tabs=max_tabs,
+    )
+    produced = 0
+    try:
+        async for item in items:
+            try:
+                suggestion = _TAB_SUGGESTION_ADAPTER.validate_python(item)
+            except ValidationError:
+                continue
+            suggestion = _offered_suggestion(suggestion, offered)
+            if suggestion is None:
+                continue
+            yield suggestion
+            produced += 1
+            if produced >= max_tabs:
+                return
+    finally:
+        await items.aclose()
+
+
+async def _complete_suggestions(
+    client: AsyncOpenAI,
+    *,
+    model: str,
+    temperature: float,
+    user_message: str,
+    max_tabs: int,
+    offered: Mapping[str, Bookmark],
+) -> list[TabSuggestion]:
+    return [
+        suggestion
+        async for suggestion in _stream_suggestions(
+            client,
+            model=model,
+            temperature=temperature,
+            user_message=user_message,
+            max_tabs=max_tabs,
+            offered=offered,
+        )
+    ]
+
+
+def _build_batch_message(user_messages: list[str]) -> str:
+    request_blocks = [
+        f"<request {number}>\n{message}\n</request {number}>"
+        for number, message in enumerate(user_messages, start=1)
+    ]
+    return (
+        f"Solve the following {len(user_messages)} independent requests.\n\n"
+        + "\n\n".join(request_blocks)
+    )
+
+
+@dataclass
+class _PendingRequest:
+    client: AsyncOpenAI
+    model: str
+    temperature: float
+    prepared: _PreparedRequest
+    max_tabs: int
+    future: asyncio.Future[list[TabSuggestion]]
+
+
+class TabRequestBatcher:
+    """
+    Coalesce concurrent tab planning calls into shared model requests.
+
+    Calls submitted within `window` seconds of each other (up to
+    `max_batch_size` of them) that target the same client, model and
+    temperature and carry identical bookmarks, history and open tabs are
+    answered by one chat completion, so only prompts over the same context
+    share a completion. A lone call is sent unchanged so it keeps the regular
+    single-request prompt.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_batch_size: int = BATCH_MAX_SIZE,
+    ) -> None:
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._queue: asyncio.Queue[_PendingRequest] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        self._dispatches: set[asyncio.Task[None]] = set()
+
+    async def submit(
+        self,
+        *,
+        client: AsyncOpenAI,
+        model: str,
+        temperature: float,
+        prepared: _PreparedRequest,
+        max_tabs: int,
+    ) -> list[TabSuggestion]:
+        """Queue one request and wait for the suggestions answering it."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+        future: asyncio.Future[list[TabSuggestion]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._queue.put_nowait(
+            _PendingRequest(client, model, temperature, prepared, max_tabs, future)
+        )
+        return await future
+
+    async def close(self) -> None:
+        """
+        Stop the background worker and fail every call it has not answered.
+
+        Queued calls are failed right away and in-flight model requests are
+        cancelled, so nothing keeps using a client that is about to be closed.
+        A later `submit` starts a new worker.
+        """
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._worker
+        self._worker = None
+
+        if self._queue is not None:
+            queued = []
+            while not self._queue.empty():
+                queued.append(self._queue.get_nowait())
+            _fail_unanswered(queued)
+
+        dispatches = list(self._dispatches)
+        for task in dispatches:
+            task.cancel()
+        await asyncio.gather(*dispatches, return_exceptions=True)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            try:
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                _fail_unanswered(batch)
+                raise
+
+            groups: dict[tuple[int, str, float, str], list[_PendingRequest]] = {}
+            for pending in batch:
+                key = (
+                    id(pending.client),
+                    pending.model,
+                    pending.temperature,
+                    pending.prepared.context,
+                )
+                groups.setdefault(key, []).append(pending)
+            for group in groups.values():
+                task = loop.create_task(self._dispatch(group))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, group: list[_PendingRequest]) -> None:
+        try:
+            await self._answer(group)
+        finally:
+            # Only reached with open futures when the dispatch was cancelled.
+            _fail_unanswered(group)
+
+    async def _answer(self, group: list[_PendingRequest]) -> None:
+        first = group[0]
+        try:
+            if len(group) == 1:
+                suggestions = await _complete_suggestions(
+                    first.client,
+                    model=first.model,
+                    temperature=first.temperature,
+                    user_message=first.prepared.user_message,
+                    max_tabs=first.max_tabs,
+                    offered=first.prepared.offered,
+                )
+                if not first.future.done():
+                    first.future.set_result(suggestions)
+                return
+
+            payload = await _complete_json(
+                first.client,
+                model=first.model,
+                temperature=first.temperature,
+                system_prompt=BATCH_SYSTEM_PROMPT,
+                user_message=_build_batch_message(
+                    [pending.prepared.user_message for pending in group]
+                ),
+                max_tokens=_max_batch_output_tokens(
+                    [pending.max_tabs for pending in group]
+                ),
+                list_key="answers",
+            )
+            results = _split_batch_answers(payload)
+        except Exception as exc:  # noqa: BLE001 - hand the failure to every caller
+            for pending in group:
+                if not pending.future.done():
+                    pending.future.set_exception(exc)
+            return
+
+        for number, pending in enumerate(group, start=1):
+            if pending.future.done():
+                continue
+            try:
+                suggestions = _parse_suggestions(
+                    results.get(number), pending.max_tabs, pending.prepared.offered
+                )
+            except LLMSuggestionError as exc:
+                pending.future.set_exception(exc)
+            else:
+                pending.future.set_result(suggestions)
+
+
+def _fail_unanswered(requests: list[_PendingRequest]) -> None:
+    for pending in requests:
+        if not pending.future.done():
+            pending.future.set_exception(
+                LLMSuggestionError("Request batcher closed before answering.")
+            )
+
+
+def _split_batch_answers(payload: dict) -> dict[int, object]:
+    answers = payload.get("answers")
+    if not isinstance(answers, list):
+        raise LLMSuggestionError(
+            "Language model response did not include an 'answers' list."
+        )
+
+    results: dict[int, object] = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            continue
+        try:
+            number = int(answer["request"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        results.setdefault(number, answer.get("tabs"))
+    return results
+
+
+@lru_cache(maxsize=1)
+def get_shared_batcher() -> TabRequestBatcher:
+    """Return the process-wide request batcher."""
+    return TabRequestBatcher()
+
+
 async def select_tabs_with_llm(
     *,
     prompt: str,
-    bookmarks: list[BookmarkPayload],
-    history: list[BrowsingHistoryPayload] | None = None,
-    open_tabs: list[OpenTabPayload] | None = None,
+    bookmarks: list[Bookmark],
+    history: list[HistoryEntry] | None = None,
+    open_tabs: list[OpenTab] | None = None,
     max_tabs: int,
     model: str | None = None,
-    temperature: float = 0.2,
+    temperature: float = DEFAULT_TEMPERATURE,
+    client: AsyncOpenAI | None = None,
+    batcher: TabRequestBatcher | None = None,
 ) -> list[TabSuggestion]:
     """
     Ask a ChatGPT model to decide which bookmarks should be opened as tabs.
@@ -173,6 +931,7 @@ async def select_tabs_with_llm(
         The user's goal or task description.
     bookmarks:
         The list of available bookmarks to choose from (must not be empty).
+        Large lists are narrowed to a lexical shortlist before prompting.
     history:
         Optional list of recent browser history items to provide extra context.
     open_tabs:
@@ -183,97 +942,309 @@ async def select_tabs_with_llm(
         Override for the OpenAI model name to use. Falls back to DEFAULT_MODEL.
     temperature:
         Creativity parameter passed through to the model.
+    client:
+        OpenAI client to use. Falls back to the shared pooled client.
+    batcher:
+        Optional batcher that coalesces this call with other concurrent ones
+        over the same bookmarks, history and open tabs into a single model
+        request. When omitted the model is called directly.
     """
-    cleaned_prompt = prompt.strip()
-    if not cleaned_prompt:
-        raise ValueError("Prompt must not be empty.")
+    prepared = await _prepare_user_message_async(
+        prompt, bookmarks, max_tabs, history=history, open_tabs=open_tabs
+    )
+    chosen_model = model or DEFAULT_MODEL
 
-    if not bookmarks:
-        raise ValueError("At least one bookmark must be provided.")
+    cache_key = _cache_key(chosen_model, temperature, prepared.user_message)
+    if cache_key is not None:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
 
-    if max_tabs <= 0:
-        raise ValueError("max_tabs must be greater than zero.")
+    if client is None:
+        client = get_shared_client()
 
+    if batcher is not None:
+        suggestions = await batcher.submit(
+            client=client,
+            model=chosen_model,
+            temperature=temperature,
+            prepared=prepared,
+            max_tabs=max_tabs,
+        )
+    else:
+        suggestions = await _complete_suggestions(
+            client,
+            model=chosen_model,
+            temperature=temperature,
+            user_message=prepared.user_message,
+            max_tabs=max_tabs,
+            offered=prepared.offered,
+        )
+
+    if cache_key is not None and suggestions:
+        _RESPONSE_CACHE.set(cache_key, suggestions)
+    return suggestions
+
+
+async def stream_tabs_with_llm(
+    *,
+    prompt: str,
+    bookmarks: list[Bookmark],
+    history: list[HistoryEntry] | None = None,
+    open_tabs: list[OpenTab] | None = None,
+    max_tabs: int,
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    client: AsyncOpenAI | None = None,
+) -> AsyncIterator[TabSuggestion]:
+    """
+    Like `select_tabs_with_llm`, but yield each suggestion as soon as the model
+    has finished writing it.
+
+    Streamed requests are never micro-batched, since a shared completion
+    cannot be split up before it ends. Cached answers are replayed directly.
+    """
+    prepared = await _prepare_user_message_async(
+        prompt, bookmarks, max_tabs, history=history, open_tabs=open_tabs
+    )
+    chosen_model = model or DEFAULT_MODEL
+
+    cache_key = _cache_key(chosen_model, temperature, prepared.user_message)
+    if cache_key is not None:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            for suggestion in cached:
+                yield suggestion
+            return
+
+    if client is None:
+        client = get_shared_client()
+
+    suggestions: list[TabSuggestion] = []
+    stream = _stream_suggestions(
+        client,
+        model=chosen_model,
+        temperature=temperature,
+        user_message=prepared.user_message,
+        max_tabs=max_tabs,
+        offered=prepared.offered,
+    )
     try:
-        validated_bookmarks = [BookmarkPayload.model_validate(b) for b in bookmarks]
-    except ValidationError as exc:
-        raise ValueError(f"Invalid bookmark payload: {exc}") from exc
+        async for suggestion in stream:
+            suggestions.append(suggestion)
+            yield suggestion
+    finally:
+        await stream.aclose()
 
-    validated_history = None
-    if history is not None:
-        try:
-            validated_history = [
-                BrowsingHistoryPayload.model_validate(item) for item in history
-            ]
-        except ValidationError as exc:
-            raise ValueError(f"Invalid browsing history payload: {exc}") from exc
-
-    validated_open_tabs = None
-    if open_tabs is not None:
-        try:
-            validated_open_tabs = [
-                OpenTabPayload.model_validate(item) for item in open_tabs
-            ]
-        except ValidationError as exc:
-            raise ValueError(f"Invalid open tab payload: {exc}") from exc
-
-    client = _get_client()
-    user_message = _build_user_message(
-        cleaned_prompt,
-        validated_bookmarks,
-        max_tabs,
-        history=validated_history,
-        open_tabs=validated_open_tabs,
+    if cache_key is not None and suggestions:
+        _RESPONSE_CACHE.set(cache_key, suggestions)
+
+
+class TabPlan(Protocol):
+    """The inputs of one tab planning request, as accepted by the batch path."""
+
+    prompt: str
+    bookmarks: list[Bookmark]
+    history: list[HistoryEntry] | None
+    open_tabs: list[OpenTab] | None
+
+
+@dataclass(frozen=True)
+class TabBatchResult:
+    batch_id: str
+    status: str
+    results: list[list[TabSuggestion] | None] | None
+
+
+def _batch_line(
+    index: int,
+    *,
+    model: str,
+    temperature: float,
+    user_message: str,
+    max_tabs: int,
+) -> bytes:
+    return orjson.dumps(
+        {
+            "custom_id": f"request-{index}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "temperature": temperature,
+                "max_tokens": _max_output_tokens(max_tabs),
+                "stop": STOP_SEQUENCES,
+                "response_format": {"type": "json_object"},
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": user_message},
+                ],
+            },
+        }
     )
+
+
+def _build_batch_file(
+    plans: Sequence[TabPlan], *, max_tabs: int, model: str, temperature: float
+) -> bytes:
+    lines = []
+    for index, plan in enumerate(plans):
+        try:
+            prepared = _prepare_user_message(
+                plan.prompt,
+                plan.bookmarks,
+                max_tabs,
+                history=plan.history,
+                open_tabs=plan.open_tabs,
+            )
+        except ValueError as exc:
+            raise ValueError(f"Request {index}: {exc}") from exc
+        lines.append(
+            _batch_line(
+                index,
+                model=model,
+                temperature=temperature,
+                user_message=prepared.user_message,
+                max_tabs=max_tabs,
+            )
+        )
+    return b"\n".join(lines)
+
+
+async def submit_tab_batch(
+    plans: Sequence[TabPlan],
+    *,
+    max_tabs: int,
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    client: AsyncOpenAI | None = None,
+) -> TabBatchResult:
+    """
+    Submit many tab planning requests as one OpenAI batch job.
+
+    Batch jobs finish asynchronously (within 24 hours) at a lower price than
+    regular requests, which suits background or scheduled planning. Use
+    `fetch_tab_batch` with the returned id to collect the results.
+    """
+    if not plans:
+        raise ValueError("At least one request must be provided.")
+
     chosen_model = model or DEFAULT_MODEL
+    # Building every prompt is CPU-bound, so keep it off the event loop.
+    batch_file = await asyncio.to_thread(
+        _build_batch_file,
+        plans,
+        max_tabs=max_tabs,
+        model=chosen_model,
+        temperature=temperature,
+    )
+
+    if client is None:
+        client = get_shared_client()
 
     try:
-        response = await client.chat.completions.create(
-            model=chosen_model,
-            temperature=temperature,
-            response_format={
-                "type": "json_schema",
-                "json_schema": RESPONSE_SCHEMA,
+        input_file = await client.files.create(
+            file=("tab_plans.jsonl", batch_file),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={
+                "source": BATCH_METADATA_SOURCE,
+                "max_tabs": str(max_tabs),
+                "request_count": str(len(plans)),
             },
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_message},
-            ],
         )
     except Exception as exc:  # noqa: BLE001 - bubble up as domain-specific error
-        raise LLMSuggestionError(f"OpenAI API request failed: {exc}") from exc
+        raise LLMSuggestionError(f"OpenAI batch submission failed: {exc}") from exc
 
-    if not response.choices:
-        raise LLMSuggestionError("Language model returned no choices.")
+    return TabBatchResult(batch_id=batch.id, status=batch.status, results=None)
 
-    message = response.choices[0].message
-    if message is None or message.content is None:
-        raise LLMSuggestionError("Language model returned an empty message.")
 
+def _batch_output_suggestions(
+    line: dict, max_tabs: int | None
+) -> tuple[int, list[TabSuggestion]] | None:
     try:
-        payload = json.loads(message.content)
-    except json.JSONDecodeError as exc:
-        raise LLMSuggestionError("Language model response was not valid JSON.") from exc
+        index = int(str(line["custom_id"]).removeprefix("request-"))
+        choice = line["response"]["body"]["choices"][0]
+        content = choice["message"]["content"]
+    except (KeyError, IndexError, TypeError, ValueError):
+        return None
+    if not isinstance(choice, dict) or not isinstance(content, str):
+        return None
 
-    tabs_data = payload.get("tabs")
-    if not isinstance(tabs_data, list):
-        raise LLMSuggestionError(
-            "Language model response did not include a 'tabs' list."
-        )
+    try:
+        payload = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # Keep the complete items of an answer cut off by the output cap.
+        if choice.get("finish_reason") != "length":
+            return None
+        payload = {"tabs": _TabObjectScanner().feed(content)}
+    if not isinstance(payload, dict):
+        return None
+    try:
+        return index, _parse_suggestions(payload.get("tabs"), max_tabs)
+    except LLMSuggestionError:
+        return None
 
-    suggestions: list[TabSuggestion] = []
-    for item in tabs_data:
-        if not isinstance(item, dict):
+
+async def fetch_tab_batch(
+    batch_id: str, *, client: AsyncOpenAI | None = None
+) -> TabBatchResult:
+    """
+    Look up a batch submitted with `submit_tab_batch`.
+
+    `results` is populated once the batch has produced output, with one entry
+    per submitted request in the original order. Requests that failed or whose
+    response could not be parsed are reported as `None`.
+
+    Unlike `select_tabs_with_llm`, results are not checked against the
+    bookmarks each request offered, since those are not kept with the batch;
+    every model-written title and URL that validates is returned as-is.
+
+    Raises `TabBatchNotFoundError` for unknown ids and for batches on the same
+    OpenAI account that were not submitted through `submit_tab_batch`.
+    """
+    if client is None:
+        client = get_shared_client()
+
+    try:
+        batch = await client.batches.retrieve(batch_id)
+    except NotFoundError as exc:
+        raise TabBatchNotFoundError(f"Unknown batch: {batch_id}") from exc
+    except Exception as exc:  # noqa: BLE001 - bubble up as domain-specific error
+        raise LLMSuggestionError(f"OpenAI batch lookup failed: {exc}") from exc
+
+    metadata = batch.metadata or {}
+    if metadata.get("source") != BATCH_METADATA_SOURCE:
+        raise TabBatchNotFoundError(f"Unknown batch: {batch_id}")
+
+    if not batch.output_file_id:
+        return TabBatchResult(batch_id=batch.id, status=batch.status, results=None)
+
+    try:
+        output = await client.files.content(batch.output_file_id)
+    except Exception as exc:  # noqa: BLE001 - bubble up as domain-specific error
+        raise LLMSuggestionError(f"OpenAI batch lookup failed: {exc}") from exc
+
+    max_tabs = int(metadata["max_tabs"]) if "max_tabs" in metadata else None
+    if "request_count" in metadata:
+        request_count = int(metadata["request_count"])
+    else:
+        request_count = batch.request_counts.total if batch.request_counts else 0
+
+    results: list[list[TabSuggestion] | None] = [None] * request_count
+    for raw_line in output.content.splitlines():
+        if not raw_line.strip():
             continue
         try:
-            suggestion = TabSuggestion(
-                title=item["title"],
-                url=item["url"],
-                reason=item.get("reason", "No reason provided."),
-                score=float(item.get("score", 0.5)),
-            )
-        except (KeyError, TypeError, ValueError):
+            line = orjson.loads(raw_line)
+        except orjson.JSONDecodeError:
             continue
-        suggestions.append(suggestion)
+        parsed = _batch_output_suggestions(line, max_tabs)
+        if parsed is not None and 0 <= parsed[0] < request_count:
+            results[parsed[0]] = parsed[1]
 
-    return suggestions[:max_tabs]
+    return TabBatchResult(batch_id=batch.id, status=batch.status, results=results)
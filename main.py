@@ -1,23 +1,54 @@
-from fastapi import FastAPI, HTTPException
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
+import orjson
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
+from fastapi.responses import StreamingResponse
+from openai import AsyncOpenAI
+from pydantic import BaseModel
 
 from llm import (
-    BookmarkPayload,
-    BrowsingHistoryPayload,
+    DEFAULT_TEMPERATURE,
+    Bookmark,
+    HistoryEntry,
     LLMSuggestionError,
-    OpenTabPayload,
+    OpenTab,
+    TabBatchNotFoundError,
+    TabBatchResult,
+    TabRequestBatcher,
+    TabSuggestion,
+    close_shared_client,
+    fetch_tab_batch,
+    get_shared_batcher,
+    get_shared_client,
     select_tabs_with_llm,
+    stream_tabs_with_llm,
+    submit_tab_batch,
 )
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Build the pooled OpenAI client up front so the first request does not pay
+    # for it. Without an API key the app still starts; requests report the
+    # missing key instead.
+    with suppress(LLMSuggestionError):
+        get_shared_client()
+    yield
+    await get_shared_batcher().close()
+    await close_shared_client()
+
+
 app = FastAPI(
     title="Bookmark Tab Planner",
     description="Suggests which browser tabs to open based on a prompt and saved bookmarks.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -29,26 +60,6 @@ app.add_middleware(
 )
 
 
-class Bookmark(BaseModel):
-    title: str
-    url: HttpUrl
-    tags: list[str] | None = None
-    description: str | None = None
-
-
-class HistoryEntry(BaseModel):
-    title: str
-    url: HttpUrl
-    last_visited: str | None = None
-
-
-class OpenTab(BaseModel):
-    title: str
-    url: HttpUrl
-    opened_at: str | None = None
-    pinned: bool | None = None
-
-
 class TabPlanRequest(BaseModel):
     prompt: str
     bookmarks: list[Bookmark]
@@ -58,7 +69,7 @@ class TabPlanRequest(BaseModel):
 
 class Tab(BaseModel):
     title: str
-    url: HttpUrl
+    url: str
     reason: str
     score: float
 
@@ -67,7 +78,35 @@ class TabPlanResponse(BaseModel):
     tabs: list[Tab]
 
 
+class TabBatchRequest(BaseModel):
+    requests: list[TabPlanRequest]
+
+
+class TabBatchResponse(BaseModel):
+    id: str
+    status: str
+    results: list[TabPlanResponse | None] | None = None
+
+
 MAX_TABS_DEFAULT = 5
+MAX_TABS_LIMIT = 20
+
+
+def _max_tabs(limit: int) -> int:
+    return min(limit, MAX_TABS_LIMIT) if limit > 0 else MAX_TABS_DEFAULT
+
+
+# Dependencies are coroutines so that FastAPI does not hand them to the
+# threadpool on every request.
+async def get_llm_client() -> AsyncOpenAI:
+    try:
+        return get_shared_client()
+    except LLMSuggestionError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+
+async def get_llm_batcher() -> TabRequestBatcher:
+    return get_shared_batcher()
 
 
 # Health check
@@ -81,39 +120,22 @@ async def plan_tabs_llm(
     request: TabPlanRequest,
     limit: int = MAX_TABS_DEFAULT,
     model: str | None = None,
-    temperature: float = 0.2,
+    temperature: float = DEFAULT_TEMPERATURE,
+    client: AsyncOpenAI = Depends(get_llm_client),
+    batcher: TabRequestBatcher = Depends(get_llm_batcher),
 ) -> TabPlanResponse:
-    max_tabs = limit if limit > 0 else MAX_TABS_DEFAULT
+    max_tabs = _max_tabs(limit)
     try:
-        bookmarks_payload = [
-            BookmarkPayload.model_validate(bookmark.model_dump())
-            for bookmark in request.bookmarks
-        ]
-        history_payload = (
-            [
-                BrowsingHistoryPayload.model_validate(item.model_dump())
-                for item in request.history
-            ]
-            if request.history
-            else None
-        )
-        open_tabs_payload = (
-            [
-                OpenTabPayload.model_validate(item.model_dump())
-                for item in request.open_tabs
-            ]
-            if request.open_tabs
-            else None
-        )
-
         suggestions = await select_tabs_with_llm(
             prompt=request.prompt,
-            bookmarks=bookmarks_payload,
-            history=history_payload,
-            open_tabs=open_tabs_payload,
+            bookmarks=request.bookmarks,
+            history=request.history,
+            open_tabs=request.open_tabs,
             max_tabs=max_tabs,
             model=model,
             temperature=temperature,
+            client=client,
+            batcher=batcher,
         )
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -139,6 +161,135 @@ async def plan_tabs_llm(
     return TabPlanResponse(tabs=tabs)
 
 
+@app.post("/tabs/stream", response_class=StreamingResponse)
+async def plan_tabs_stream(
+    request: TabPlanRequest,
+    limit: int = MAX_TABS_DEFAULT,
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    client: AsyncOpenAI = Depends(get_llm_client),
+) -> StreamingResponse:
+    """
+    Stream tab suggestions as newline-delimited JSON, one `Tab` object per
+    line, as soon as the model produces each of them.
+
+    Errors before the first suggestion are reported with the same status
+    codes as `/tabs`. A failure after streaming has started ends the body
+    with a final `{"error": ...}` line.
+    """
+    max_tabs = _max_tabs(limit)
+    suggestions = stream_tabs_with_llm(
+        prompt=request.prompt,
+        bookmarks=request.bookmarks,
+        history=request.history,
+        open_tabs=request.open_tabs,
+        max_tabs=max_tabs,
+        model=model,
+        temperature=temperature,
+        client=client,
+    )
+
+    # Wait for the first suggestion so that request and model errors can still
+    # be turned into a proper HTTP status.
+    try:
+        first = await anext(suggestions)
+    except StopAsyncIteration:
+        raise HTTPException(
+            status_code=502,
+            detail="Language model returned no tab suggestions.",
+        ) from None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except LLMSuggestionError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    async def body() -> AsyncIterator[bytes]:
+        try:
+            yield _ndjson_line(first)
+            async for suggestion in suggestions:
+                yield _ndjson_line(suggestion)
+        except LLMSuggestionError as exc:
+            yield orjson.dumps({"error": str(exc)}) + b"\n"
+        finally:
+            await suggestions.aclose()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+def _ndjson_line(suggestion: TabSuggestion) -> bytes:
+    return orjson.dumps(suggestion) + b"\n"
+
+
+def _batch_response(batch: TabBatchResult) -> TabBatchResponse:
+    results = None
+    if batch.results is not None:
+        results = [
+            TabPlanResponse(
+                tabs=[
+                    Tab(
+                        title=suggestion.title,
+                        url=suggestion.url,
+                        reason=suggestion.reason,
+                        score=suggestion.score,
+                    )
+                    for suggestion in suggestions
+                ]
+            )
+            if suggestions is not None
+            else None
+            for suggestions in batch.results
+        ]
+    return TabBatchResponse(id=batch.batch_id, status=batch.status, results=results)
+
+
+@app.post("/tabs/batch", response_model=TabBatchResponse)
+async def submit_tabs_batch(
+    request: TabBatchRequest,
+    limit: int = MAX_TABS_DEFAULT,
+    model: str | None = None,
+    temperature: float = DEFAULT_TEMPERATURE,
+    client: AsyncOpenAI = Depends(get_llm_client),
+) -> TabBatchResponse:
+    max_tabs = _max_tabs(limit)
+    try:
+        batch = await submit_tab_batch(
+            request.requests,
+            max_tabs=max_tabs,
+            model=model,
+            temperature=temperature,
+            client=client,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except LLMSuggestionError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    return _batch_response(batch)
+
+
+@app.get("/tabs/batch/{batch_id}", response_model=TabBatchResponse)
+async def get_tabs_batch(
+    batch_id: str,
+    client: AsyncOpenAI = Depends(get_llm_client),
+) -> TabBatchResponse:
+    """
+    Report the status of a batch submitted through `/tabs/batch`, with its
+    results once it has finished.
+
+    Unlike `/tabs` and `/tabs/stream`, suggestions are not limited to the
+    bookmarks each request sent and keep the model's own titles, because the
+    submitted bookmarks are not stored with the batch.
+    """
+    try:
+        batch = await fetch_tab_batch(batch_id, client=client)
+    except TabBatchNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    except LLMSuggestionError as exc:
+        raise HTTPException(status_code=502, detail=str(exc)) from exc
+
+    return _batch_response(batch)
+
+
 if __name__ == "__main__":
     import uvicorn
 
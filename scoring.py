@@ -0,0 +1,194 @@
+"""
+Lexical scoring helpers shared by the tab planners.
+
+The main entry point is `prefilter`, which ranks bookmarks against a prompt
+with BM25 so that only a shortlist of plausible candidates has to be sent to
+the language model.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from llm import Bookmark
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Words may contain inner hyphens ("e-mail"), but a hyphen is never a token
+# on its own and never starts or ends one.
+_TOKEN_RE = re.compile(r"\w(?:[\w-]*\w)?")
+# Maps every ASCII character that can never be part of a token to a space, so
+# ASCII text can be tokenized with `str.split` instead of the regex engine.
+# Hyphens survive the translation and are trimmed from the pieces afterwards.
+_ASCII_SEPARATORS = str.maketrans(
+    {
+        chr(code): " "
+        for code in range(128)
+        if not (chr(code).isalnum() or chr(code) in "_-")
+    }
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word tokens, keeping duplicates."""
+    lowered = text.lower()
+    if lowered.isascii():
+        tokens = lowered.translate(_ASCII_SEPARATORS).split()
+        if "-" in lowered:
+            tokens = [stripped for token in tokens if (stripped := token.strip("-"))]
+        return tokens
+    return _TOKEN_RE.findall(lowered)
+
+
+@lru_cache(maxsize=4096)
+def query_terms(text: str) -> frozenset[str]:
+    """Return the distinct tokens of a prompt; prompts often repeat."""
+    return frozenset(tokenize(text))
+
+
+@dataclass(frozen=True)
+class BookmarkTerms:
+    """Token frequencies of one bookmark's searchable text."""
+
+    counts: Mapping[str, int]
+    length: int
+
+
+@lru_cache(maxsize=4096)
+def _bookmark_terms(
+    title: str,
+    url: str,
+    tags: tuple[str, ...] | None,
+    description: str | None,
+) -> BookmarkTerms:
+    parts = [title, url]
+    if tags:
+        parts.extend(tags)
+    if description:
+        parts.append(description)
+    tokens = tokenize(" ".join(parts))
+    return BookmarkTerms(counts=MappingProxyType(Counter(tokens)), length=len(tokens))
+
+
+def _bookmark_key(
+    bookmark: Bookmark,
+) -> tuple[str, str, tuple[str, ...] | None, str | None]:
+    return (
+        bookmark.title,
+        bookmark.url,
+        tuple(bookmark.tags) if bookmark.tags else None,
+        bookmark.description,
+    )
+
+
+def bookmark_terms(bookmark: Bookmark) -> BookmarkTerms:
+    """Return the (cached) token frequencies of a bookmark."""
+    return _bookmark_terms(*_bookmark_key(bookmark))
+
+
+@dataclass(frozen=True)
+class BookmarkIndex:
+    """
+    Column-oriented BM25 index over a fixed list of bookmarks.
+
+    Each vocabulary term maps to parallel arrays of bookmark positions and term
+    frequencies, and the BM25 length normalisation of every bookmark is
+    precomputed, so scoring a prompt only visits the postings of its terms.
+    """
+
+    size: int
+    norms: array
+    weights: Mapping[str, float]
+    postings: Mapping[str, tuple[array, array]]
+
+    @classmethod
+    def build(cls, documents: Sequence[BookmarkTerms]) -> BookmarkIndex:
+        size = len(documents)
+        average_length = (
+            sum(document.length for document in documents) / size if size else 0.0
+        ) or 1.0
+        norms = array(
+            "d",
+            (
+                BM25_K1 * (1.0 - BM25_B + BM25_B * document.length / average_length)
+                for document in documents
+            ),
+        )
+
+        postings: dict[str, tuple[array, array]] = {}
+        for position, document in enumerate(documents):
+            for term, frequency in document.counts.items():
+                columns = postings.get(term)
+                if columns is None:
+                    columns = postings[term] = (array("I"), array("I"))
+                columns[0].append(position)
+                columns[1].append(frequency)
+
+        weights = {
+            term: math.log((size - len(positions) + 0.5) / (len(positions) + 0.5) + 1.0)
+            for term, (positions, _) in postings.items()
+        }
+        return cls(
+            size=size,
+            norms=norms,
+            weights=MappingProxyType(weights),
+            postings=MappingProxyType(postings),
+        )
+
+    def scores(self, terms: Iterable[str]) -> list[float]:
+        scores = [0.0] * self.size
+        norms = self.norms
+        for term in terms:
+            columns = self.postings.get(term)
+            if columns is None:
+                continue
+            weight = self.weights[term] * (BM25_K1 + 1.0)
+            for position, frequency in zip(*columns):
+                scores[position] += weight * frequency / (frequency + norms[position])
+        return scores
+
+
+@lru_cache(maxsize=64)
+def _bookmark_index(
+    keys: tuple[tuple[str, str, tuple[str, ...] | None, str | None], ...],
+) -> BookmarkIndex:
+    return BookmarkIndex.build([_bookmark_terms(*key) for key in keys])
+
+
+def bookmark_index(bookmarks: Sequence[Bookmark]) -> BookmarkIndex:
+    """Return the index for a bookmark list, reusing it for identical lists."""
+    return _bookmark_index(tuple(_bookmark_key(bookmark) for bookmark in bookmarks))
+
+
+def bm25_scores(prompt: str, bookmarks: Sequence[Bookmark]) -> list[float]:
+    """Score every bookmark against the prompt with Okapi BM25."""
+    terms = query_terms(prompt)
+    if not terms or not bookmarks:
+        return [0.0] * len(bookmarks)
+    return bookmark_index(bookmarks).scores(terms)
+
+
+def prefilter(prompt: str, bookmarks: list[Bookmark], *, k: int) -> list[Bookmark]:
+    """
+    Return the `k` bookmarks that best match the prompt lexically.
+
+    Lists that already fit within `k` are returned unchanged. Ties, including
+    bookmarks that share no terms with the prompt, keep their original order.
+    """
+    if len(bookmarks) <= k:
+        return list(bookmarks)
+
+    scores = bm25_scores(prompt, bookmarks)
+    top = heapq.nlargest(k, range(len(bookmarks)), key=scores.__getitem__)
+    return [bookmarks[index] for index in top]
@@ -0,0 +1,10 @@
+import pytest
+
+import llm
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    llm._RESPONSE_CACHE.clear()
+    yield
+    llm._RESPONSE_CACHE.clear()
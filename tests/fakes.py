@@ -0,0 +1,101 @@
+"""Stand-ins for the parts of the OpenAI client used by the tab planner."""
+
+import asyncio
+import re
+from collections.abc import Callable
+from types import SimpleNamespace
+
+import orjson
+
+_REQUEST_RE = re.compile(r"<request (\d+)>\n(.*?)\n</request \1>", re.DOTALL)
+
+
+def tab(url: str, **fields: object) -> dict:
+    return {"title": url, "url": url, "reason": "Relevant.", "score": 0.9, **fields}
+
+
+class FakeStream:
+    def __init__(self, content: str, *, fail_at_end: bool = False) -> None:
+        self._parts = [content[i : i + 5] for i in range(0, len(content), 5)]
+        self._fail_at_end = fail_at_end
+
+    def __aiter__(self) -> "FakeStream":
+        return self
+
+    async def __anext__(self) -> SimpleNamespace:
+        if not self._parts:
+            if self._fail_at_end:
+                raise RuntimeError("connection reset")
+            raise StopAsyncIteration
+        delta = SimpleNamespace(content=self._parts.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self) -> None:
+        self._parts = []
+
+
+class FakeCompletions:
+    """
+    Answer each user message with the tabs registered for it.
+
+    `answers` maps a single request's user message to its tabs, or is a
+    function computing them. Several `<request N>` blocks in one message are
+    answered in the micro-batch format.
+    """
+
+    def __init__(
+        self,
+        answers: dict[str, list[dict]] | Callable[[str], list[dict]],
+        *,
+        fail: bool = False,
+        hang: bool = False,
+        fail_mid_stream: bool = False,
+        truncate: Callable[[str], int] | None = None,
+    ) -> None:
+        self.answers = answers
+        self.fail = fail
+        self.hang = hang
+        self.fail_mid_stream = fail_mid_stream
+        self.truncate = truncate
+        self.calls: list[dict] = []
+
+    def _tabs(self, message: str) -> list[dict] | None:
+        if callable(self.answers):
+            return self.answers(message)
+        return self.answers.get(message)
+
+    async def create(self, **kwargs: object) -> object:
+        self.calls.append(kwargs)
+        await asyncio.sleep(0)
+        if self.hang:
+            await asyncio.Event().wait()
+        if self.fail:
+            raise RuntimeError("upstream unavailable")
+
+        user_message = kwargs["messages"][1]["content"]
+        if kwargs.get("stream"):
+            content = orjson.dumps({"tabs": self._tabs(user_message)}).decode()
+            return FakeStream(content, fail_at_end=self.fail_mid_stream)
+
+        answers = []
+        for number, message in _REQUEST_RE.findall(user_message):
+            tabs = self._tabs(message)
+            if tabs is not None:
+                answers.append({"request": int(number), "tabs": tabs})
+        content = orjson.dumps({"answers": answers}).decode()
+        finish_reason = "stop"
+        if self.truncate is not None:
+            content = content[: self.truncate(content)]
+            finish_reason = "length"
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message, finish_reason=finish_reason)]
+        )
+
+
+def fake_client(
+    answers: dict[str, list[dict]] | Callable[[str], list[dict]], **kwargs: object
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=FakeCompletions(answers, **kwargs))
+    )
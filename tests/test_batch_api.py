@@ -0,0 +1,150 @@
+from types import SimpleNamespace
+
+import httpx
+import openai
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from llm import _batch_output_suggestions
+
+
+class _FakeFiles:
+    def __init__(self) -> None:
+        self.uploaded: bytes | None = None
+        self.broken_lines: list[dict] = []
+
+    async def create(self, *, file: tuple[str, bytes], purpose: str) -> object:
+        self.uploaded = file[1]
+        return SimpleNamespace(id="file-in")
+
+    async def content(self, file_id: str) -> object:
+        lines = []
+        for raw_line in self.uploaded.splitlines():
+            request = orjson.loads(raw_line)
+            tabs = [
+                {"title": "A", "url": "https://a.example", "score": 0.8},
+                {"title": "B", "url": "https://b.example", "score": 0.5},
+            ]
+            content = orjson.dumps({"tabs": tabs}).decode()
+            choice = {"message": {"content": content}, "finish_reason": "stop"}
+            if request["custom_id"] == "request-1":
+                # Cut off in the middle of the second tab.
+                choice = {
+                    "message": {"content": content[: content.index('"B"')]},
+                    "finish_reason": "length",
+                }
+            body = {"choices": [choice]}
+            lines.append(
+                orjson.dumps(
+                    {"custom_id": request["custom_id"], "response": {"body": body}}
+                )
+            )
+        lines.extend(orjson.dumps(line) for line in self.broken_lines)
+        return SimpleNamespace(content=b"\n".join(lines))
+
+
+class _FakeBatches:
+    def __init__(self) -> None:
+        self.batches: dict[str, dict] = {}
+
+    async def create(self, *, metadata: dict, **kwargs: object) -> object:
+        self.batches["batch_1"] = metadata
+        return SimpleNamespace(id="batch_1", status="validating")
+
+    async def retrieve(self, batch_id: str) -> object:
+        if batch_id not in self.batches:
+            request = httpx.Request("GET", f"https://api.openai.test/{batch_id}")
+            response = httpx.Response(404, request=request)
+            raise openai.NotFoundError("No such batch", response=response, body=None)
+        return SimpleNamespace(
+            id=batch_id,
+            status="completed",
+            output_file_id="file-out",
+            metadata=self.batches[batch_id],
+            request_counts=None,
+        )
+
+
+@pytest.fixture
+def api():
+    client = SimpleNamespace(files=_FakeFiles(), batches=_FakeBatches())
+    main.app.dependency_overrides[main.get_llm_client] = lambda: client
+    try:
+        yield TestClient(main.app), client
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def test_submitted_batch_can_be_fetched(api):
+    test_client, _ = api
+    plan = {"prompt": "docs", "bookmarks": [{"title": "A", "url": "https://a.example"}]}
+
+    response = test_client.post("/tabs/batch?limit=5", json={"requests": [plan, plan]})
+    assert response.status_code == 200
+    assert response.json()["id"] == "batch_1"
+
+    response = test_client.get("/tabs/batch/batch_1")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [[tab["url"] for tab in result["tabs"]] for result in results] == [
+        ["https://a.example", "https://b.example"],
+        ["https://a.example"],
+    ]
+
+
+def test_batch_limit_is_clamped(api):
+    test_client, client = api
+    plan = {"prompt": "docs", "bookmarks": [{"title": "A", "url": "https://a.example"}]}
+
+    response = test_client.post("/tabs/batch?limit=100000", json={"requests": [plan]})
+    assert response.status_code == 200
+    assert client.batches.batches["batch_1"]["max_tabs"] == str(main.MAX_TABS_LIMIT)
+    body = orjson.loads(client.files.uploaded)["body"]
+    assert body["max_tokens"] == main.MAX_TABS_LIMIT * 100 + 20
+
+
+def test_unknown_batch_is_not_found(api):
+    test_client, _ = api
+    assert test_client.get("/tabs/batch/batch_missing").status_code == 404
+
+
+def test_batches_from_other_apps_are_not_found(api):
+    test_client, client = api
+    client.batches.batches["batch_other"] = {"max_tabs": "3"}
+    assert test_client.get("/tabs/batch/batch_other").status_code == 404
+
+
+def test_malformed_output_lines_are_reported_as_missing(api):
+    test_client, client = api
+    plan = {"prompt": "docs", "bookmarks": [{"title": "A", "url": "https://a.example"}]}
+    response = test_client.post("/tabs/batch", json={"requests": [plan, plan, plan]})
+    assert response.status_code == 200
+
+    # request-1 is replaced by a line whose content is null.
+    null_content = {"message": {"content": None}, "finish_reason": "length"}
+    client.files.broken_lines = [
+        {"custom_id": "request-1", "response": {"body": {"choices": [null_content]}}},
+        {"custom_id": "request-2", "response": {"body": {"choices": ["oops"]}}},
+    ]
+    uploaded = client.files.uploaded.splitlines()
+    client.files.uploaded = uploaded[0]
+
+    response = test_client.get("/tabs/batch/batch_1")
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0] is not None
+    assert results[1:] == [None, None]
+
+
+def test_output_line_parsing_rejects_unexpected_shapes():
+    for choice in (
+        {"message": {"content": None}, "finish_reason": "length"},
+        {"message": {"content": 42}, "finish_reason": "stop"},
+        {"message": None},
+        "not a choice",
+        ["not", "a", "choice"],
+    ):
+        line = {"custom_id": "request-0", "response": {"body": {"choices": [choice]}}}
+        assert _batch_output_suggestions(line, 5) is None
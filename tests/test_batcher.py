@@ -0,0 +1,334 @@
+import asyncio
+
+import pytest
+
+from fakes import fake_client, tab
+from llm import Bookmark, LLMSuggestionError, TabRequestBatcher, _PreparedRequest
+
+
+def _submit(
+    batcher, client, message, *, model="model", context="ctx", offered=(), max_tabs=5
+):
+    prepared = _PreparedRequest(
+        user_message=message,
+        context=context,
+        offered={url: Bookmark(title=f"Own {url}", url=url) for url in offered},
+    )
+    return batcher.submit(
+        client=client,
+        model=model,
+        temperature=0.0,
+        prepared=prepared,
+        max_tabs=max_tabs,
+    )
+
+
+def _urls(suggestions) -> list[str]:
+    return [suggestion.url for suggestion in suggestions]
+
+
+def test_concurrent_requests_share_one_completion_and_fan_out():
+    client = fake_client(
+        {"a": [tab("https://a.example")], "b": [tab("https://b.example")]}
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(batcher, client, "a", offered={"https://a.example"}),
+            _submit(batcher, client, "b", offered={"https://b.example"}),
+        )
+        await batcher.close()
+        return results
+
+    first, second = asyncio.run(run())
+    assert _urls(first) == ["https://a.example"]
+    assert _urls(second) == ["https://b.example"]
+    (call,) = client.chat.completions.calls
+    assert "stream" not in call
+    # Two answers of up to 5 tabs, each with its request wrapper.
+    assert call["max_tokens"] == 2 * (5 * 100 + 20) + 20
+
+
+def test_lone_request_uses_the_single_request_stream():
+    client = fake_client({"a": [tab("https://a.example")]})
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.0)
+        result = await _submit(batcher, client, "a", offered={"https://a.example"})
+        await batcher.close()
+        return result
+
+    assert _urls(asyncio.run(run())) == ["https://a.example"]
+    (call,) = client.chat.completions.calls
+    assert call["stream"] is True
+    assert call["messages"][1]["content"] == "a"
+
+
+def test_answers_only_contain_the_callers_own_bookmarks():
+    # The model mixes up the requests and hands each one the other's bookmark.
+    client = fake_client(
+        {
+            "a": [tab("https://private-b.example"), tab("https://a.example")],
+            "b": [tab("https://private-a.example")],
+        }
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(batcher, client, "a", offered={"https://a.example"}),
+            _submit(batcher, client, "b", offered={"https://b.example"}),
+        )
+        await batcher.close()
+        return results
+
+    first, second = asyncio.run(run())
+    assert _urls(first) == ["https://a.example"]
+    assert second == []
+
+
+def test_titles_come_from_the_callers_own_bookmarks():
+    client = fake_client(
+        {
+            "a": [tab("https://a.example", title="Request b's secret project")],
+            "b": [tab("https://b.example")],
+        }
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(batcher, client, "a", offered={"https://a.example"}),
+            _submit(batcher, client, "b", offered={"https://b.example"}),
+        )
+        await batcher.close()
+        return results
+
+    first, second = asyncio.run(run())
+    assert [suggestion.title for suggestion in first] == ["Own https://a.example"]
+    assert [suggestion.title for suggestion in second] == ["Own https://b.example"]
+
+
+def test_requests_with_different_context_are_never_combined():
+    # The model echoes every prompt it sees into its reasons, so anything shared
+    # between the two users would show up in the other one's answer.
+    client = fake_client(
+        lambda message: [tab("https://shared.example", reason=f"Saw {message}.")]
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(
+                batcher,
+                client,
+                "alice's history",
+                context="alice",
+                offered={"https://shared.example"},
+            ),
+            _submit(
+                batcher,
+                client,
+                "bob's open tabs",
+                context="bob",
+                offered={"https://shared.example"},
+            ),
+        )
+        await batcher.close()
+        return results
+
+    alice, bob = asyncio.run(run())
+    assert [suggestion.reason for suggestion in alice] == ["Saw alice's history."]
+    assert [suggestion.reason for suggestion in bob] == ["Saw bob's open tabs."]
+    calls = client.chat.completions.calls
+    assert [call.get("stream") for call in calls] == [True, True]
+
+
+def test_single_request_drops_urls_it_did_not_offer():
+    client = fake_client(
+        {"a": [tab("https://invented.example"), tab("https://a.example")]}
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.0)
+        result = await _submit(batcher, client, "a", offered={"https://a.example"})
+        await batcher.close()
+        return result
+
+    assert _urls(asyncio.run(run())) == ["https://a.example"]
+
+
+def test_requests_are_grouped_by_client_and_model():
+    answers = {"a": [tab("https://a.example")], "b": [tab("https://b.example")]}
+    client, other_client = fake_client(answers), fake_client(answers)
+    offered = {"https://a.example", "https://b.example"}
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        await asyncio.gather(
+            _submit(batcher, client, "a", offered=offered),
+            _submit(batcher, client, "b", offered=offered),
+            _submit(batcher, client, "a", model="other", offered=offered),
+            _submit(batcher, other_client, "b", offered=offered),
+        )
+        await batcher.close()
+
+    asyncio.run(run())
+    calls = client.chat.completions.calls
+    assert sorted((call["model"], "stream" in call) for call in calls) == [
+        ("model", False),
+        ("other", True),
+    ]
+    assert len(other_client.chat.completions.calls) == 1
+
+
+def test_batch_size_is_capped():
+    answers = {name: [tab(f"https://{name}.example")] for name in "abc"}
+    client = fake_client(answers)
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05, max_batch_size=2)
+        results = await asyncio.gather(
+            *(
+                _submit(batcher, client, name, offered={f"https://{name}.example"})
+                for name in "abc"
+            )
+        )
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert [_urls(result) for result in results] == [
+        ["https://a.example"],
+        ["https://b.example"],
+        ["https://c.example"],
+    ]
+    calls = client.chat.completions.calls
+    assert sorted("stream" in call for call in calls) == [False, True]
+
+
+def test_requests_outside_the_window_are_sent_separately():
+    client = fake_client(
+        {"a": [tab("https://a.example")], "b": [tab("https://b.example")]}
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.01)
+        first = asyncio.create_task(
+            _submit(batcher, client, "a", offered={"https://a.example"})
+        )
+        await asyncio.sleep(0.05)
+        second = await _submit(batcher, client, "b", offered={"https://b.example"})
+        await batcher.close()
+        return await first, second
+
+    first, second = asyncio.run(run())
+    assert _urls(first) == ["https://a.example"]
+    assert _urls(second) == ["https://b.example"]
+    assert [call.get("stream") for call in client.chat.completions.calls] == [
+        True,
+        True,
+    ]
+
+
+def test_missing_answer_only_fails_its_own_request():
+    client = fake_client({"a": [tab("https://a.example")]})
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(batcher, client, "a", offered={"https://a.example"}),
+            _submit(batcher, client, "b", offered={"https://b.example"}),
+            return_exceptions=True,
+        )
+        await batcher.close()
+        return results
+
+    first, second = asyncio.run(run())
+    assert _urls(first) == ["https://a.example"]
+    assert isinstance(second, LLMSuggestionError)
+
+
+def test_failed_completion_fails_every_request_in_the_batch():
+    client = fake_client({}, fail=True)
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(batcher, client, "a"),
+            _submit(batcher, client, "b"),
+            return_exceptions=True,
+        )
+        await batcher.close()
+        return results
+
+    for result in asyncio.run(run()):
+        assert isinstance(result, LLMSuggestionError)
+
+
+def test_cancelled_caller_does_not_break_the_batch():
+    client = fake_client(
+        {"a": [tab("https://a.example")], "b": [tab("https://b.example")]}
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        cancelled = asyncio.create_task(
+            _submit(batcher, client, "a", offered={"https://a.example"})
+        )
+        kept = asyncio.create_task(
+            _submit(batcher, client, "b", offered={"https://b.example"})
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        result = await kept
+        await batcher.close()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return result
+
+    assert _urls(asyncio.run(run())) == ["https://b.example"]
+
+
+def test_truncated_batch_keeps_the_complete_answers():
+    client = fake_client(
+        {"a": [tab("https://a.example")], "b": [tab("https://b.example")]},
+        truncate=lambda content: content.index('{"request":2') + 20,
+    )
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        results = await asyncio.gather(
+            _submit(batcher, client, "a", offered={"https://a.example"}),
+            _submit(batcher, client, "b", offered={"https://b.example"}),
+            return_exceptions=True,
+        )
+        await batcher.close()
+        return results
+
+    first, second = asyncio.run(run())
+    assert _urls(first) == ["https://a.example"]
+    assert isinstance(second, LLMSuggestionError)
+
+
+def test_close_fails_queued_and_in_flight_requests():
+    client = fake_client({}, hang=True)
+
+    async def run():
+        batcher = TabRequestBatcher(window=0.05)
+        in_flight = asyncio.gather(
+            _submit(batcher, client, "a"),
+            _submit(batcher, client, "b"),
+            return_exceptions=True,
+        )
+        await asyncio.sleep(0.1)
+        assert len(client.chat.completions.calls) == 1
+        queued = asyncio.ensure_future(_submit(batcher, client, "c"))
+        await asyncio.sleep(0)
+        await batcher.close()
+        return await in_flight, await asyncio.gather(queued, return_exceptions=True)
+
+    in_flight, queued = asyncio.run(run())
+    for result in in_flight + queued:
+        assert isinstance(result, LLMSuggestionError)
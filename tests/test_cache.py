@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+import llm
+from fakes import fake_client, tab
+from llm import Bookmark, ResponseCache, TabSuggestion
+
+_BOOKMARKS = [Bookmark(title="A", url="https://a.example")]
+_SUGGESTION = TabSuggestion(
+    title="A", url="https://a.example", reason="Relevant.", score=0.9
+)
+
+
+def _select(client, *, temperature=0.0):
+    return asyncio.run(
+        llm.select_tabs_with_llm(
+            prompt="docs",
+            bookmarks=_BOOKMARKS,
+            max_tabs=3,
+            temperature=temperature,
+            client=client,
+        )
+    )
+
+
+def _stream(client):
+    async def collect():
+        return [
+            suggestion
+            async for suggestion in llm.stream_tabs_with_llm(
+                prompt="docs", bookmarks=_BOOKMARKS, max_tabs=3, client=client
+            )
+        ]
+
+    return asyncio.run(collect())
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(llm.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10.0)
+    cache.set("key", [_SUGGESTION])
+
+    now[0] = 109.9
+    assert cache.get("key") == [_SUGGESTION]
+    now[0] = 110.0
+    assert cache.get("key") is None
+    # Expired entries are dropped rather than kept around.
+    now[0] = 100.0
+    assert cache.get("key") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", [_SUGGESTION])
+    cache.set("b", [_SUGGESTION])
+    assert cache.get("a") is not None
+    cache.set("c", [_SUGGESTION])
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_keys_depend_on_every_input():
+    key = ResponseCache.make_key(model="m", temperature=0.0, user_message="u")
+    assert key == ResponseCache.make_key(model="m", temperature=0.0, user_message="u")
+    assert key != ResponseCache.make_key(model="n", temperature=0.0, user_message="u")
+    assert key != ResponseCache.make_key(model="m", temperature=0.1, user_message="u")
+    assert key != ResponseCache.make_key(model="m", temperature=0.0, user_message="v")
+
+
+@pytest.mark.parametrize(("temperature", "calls"), [(0.0, 1), (0.3, 1), (0.5, 2)])
+def test_only_low_temperature_answers_are_cached(temperature, calls):
+    client = fake_client(lambda message: [tab("https://a.example")])
+    first = _select(client, temperature=temperature)
+    second = _select(client, temperature=temperature)
+
+    assert first == second == [_SUGGESTION]
+    assert len(client.chat.completions.calls) == calls
+
+
+def test_empty_answers_are_not_cached():
+    client = fake_client(lambda message: [tab("https://invented.example")])
+    assert _select(client) == []
+    assert _select(client) == []
+    assert len(client.chat.completions.calls) == 2
+
+
+def test_streamed_answers_are_cached_and_replayed():
+    client = fake_client(lambda message: [tab("https://a.example")])
+    streamed = _stream(client)
+    assert [suggestion.url for suggestion in streamed] == ["https://a.example"]
+
+    assert _stream(client) == streamed
+    assert _select(client) == streamed
+    assert len(client.chat.completions.calls) == 1
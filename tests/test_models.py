@@ -0,0 +1,17 @@
+import pytest
+from pydantic import ValidationError
+
+from llm import Bookmark
+
+
+@pytest.mark.parametrize("url", ["https://a.example", "HTTP://a.example/path?q=1"])
+def test_bookmark_accepts_http_urls(url):
+    assert Bookmark(title="A", url=url).url == url
+
+
+@pytest.mark.parametrize(
+    "url", ["https://a.example\n", "https://a .example", "ftp://a.example", "https://"]
+)
+def test_bookmark_rejects_other_urls(url):
+    with pytest.raises(ValidationError):
+        Bookmark(title="A", url=url)
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+import llm
+from llm import (
+    PREFILTER_MAX_BOOKMARKS,
+    PREFILTER_MIN_CANDIDATES,
+    Bookmark,
+    _prepare_user_message,
+    _prepare_user_message_async,
+)
+
+
+def _library(size: int) -> list[Bookmark]:
+    topics = ["python", "gardening", "recipes", "travel"]
+    return [
+        Bookmark(title=f"{topics[i % 4]} {i}", url=f"https://example.com/{i}")
+        for i in range(size)
+    ]
+
+
+def test_typical_libraries_keep_a_prompt_independent_prefix():
+    library = _library(200)
+    python = _prepare_user_message("python", library, 5)
+    recipes = _prepare_user_message("recipes", library[::-1], 5)
+
+    assert python.context == recipes.context
+    assert python.user_message.startswith(python.context)
+    assert len(python.offered) == 200
+
+
+def test_large_libraries_are_shortlisted_per_prompt():
+    library = _library(PREFILTER_MAX_BOOKMARKS + 1)
+    python = _prepare_user_message("python", library, 5)
+    recipes = _prepare_user_message("recipes", library, 5)
+
+    assert len(python.offered) == PREFILTER_MIN_CANDIDATES
+    titles = [bookmark.title for bookmark in python.offered.values()]
+    assert all(title.startswith("python") for title in titles)
+    assert python.context != recipes.context
+
+
+@pytest.mark.parametrize(
+    ("size", "threaded"),
+    [(PREFILTER_MAX_BOOKMARKS, False), (PREFILTER_MAX_BOOKMARKS + 1, True)],
+)
+def test_only_shortlisted_libraries_are_prepared_in_a_thread(
+    monkeypatch, size, threaded
+):
+    offloaded = []
+
+    async def to_thread(func, /, *args, **kwargs):
+        offloaded.append(func)
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(llm.asyncio, "to_thread", to_thread)
+    library = _library(size)
+    prepared = asyncio.run(_prepare_user_message_async("python", library, 5))
+
+    assert prepared == _prepare_user_message("python", library, 5)
+    assert offloaded == ([_prepare_user_message] if threaded else [])
@@ -0,0 +1,58 @@
+import orjson
+
+from llm import _TabObjectScanner
+
+
+def _scan(text: str, size: int) -> list[dict]:
+    scanner = _TabObjectScanner()
+    items: list[dict] = []
+    for start in range(0, len(text), size):
+        items.extend(scanner.feed(text[start : start + size]))
+    return items
+
+
+def test_items_are_emitted_for_any_chunk_size():
+    tabs = [
+        {"title": "A", "url": "https://a.example", "reason": "r", "score": 0.9},
+        {"title": "B", "url": "https://b.example", "reason": "r", "score": 0.4},
+    ]
+    text = orjson.dumps({"tabs": tabs}).decode()
+    for size in (1, 2, 7, len(text)):
+        assert _scan(text, size) == tabs
+
+
+def test_brackets_and_escaped_quotes_inside_strings_are_ignored():
+    tabs = [
+        {"title": 'A "quoted" {title}', "url": "https://a.example", "reason": "[x]"},
+        {"title": "back\\slash\\", "url": "https://b.example", "reason": '}"{'},
+    ]
+    text = orjson.dumps({"tabs": tabs}).decode()
+    assert _scan(text, 1) == tabs
+
+
+def test_nested_item_fields_stay_inside_their_item():
+    tabs = [{"title": "A", "url": "https://a.example", "meta": {"tags": [{"x": 1}]}}]
+    text = orjson.dumps({"tabs": tabs}).decode()
+    assert _scan(text, 1) == tabs
+
+
+def test_objects_outside_the_tabs_array_are_skipped():
+    tab = {"title": "A", "url": "https://a.example"}
+    text = orjson.dumps(
+        {
+            "note": {"a": {"title": "not a tab"}},
+            "tabs_hint": [{"title": "not a tab"}],
+            "label": "tabs",
+            "others": [{"title": "not a tab"}],
+            "tabs": [tab],
+        }
+    ).decode()
+    assert _scan(text, 1) == [tab]
+
+    assert _scan(orjson.dumps([[tab]]).decode(), 1) == []
+    assert _scan(orjson.dumps({"tabs": {"x": tab}}).decode(), 1) == []
+
+
+def test_truncated_item_is_not_emitted():
+    text = '{"tabs": [{"title": "A", "url": "https://a.example"}, {"title": "B", "u'
+    assert _scan(text, 3) == [{"title": "A", "url": "https://a.example"}]
@@ -0,0 +1,53 @@
+from llm import Bookmark
+from scoring import _TOKEN_RE, bm25_scores, prefilter, tokenize
+
+
+def _bookmark(title: str, **kwargs: object) -> Bookmark:
+    slug = title.lower().replace(" ", "-")
+    return Bookmark(title=title, url=f"https://example.com/{slug}", **kwargs)
+
+
+def test_tokenize_keeps_inner_hyphens_only():
+    assert tokenize("Café - Crème -brûlée e-mail ") == [
+        "café",
+        "crème",
+        "brûlée",
+        "e-mail",
+    ]
+
+
+def test_bm25_prefers_matching_and_repeated_terms():
+    bookmarks = [
+        _bookmark("Gardening tips"),
+        _bookmark("Python asyncio guide", tags=["python"]),
+        _bookmark("Python packaging"),
+    ]
+    scores = bm25_scores("python asyncio", bookmarks)
+    assert scores[0] == 0.0
+    assert scores[1] > scores[2] > 0.0
+
+
+def test_prefilter_returns_top_k_in_score_order():
+    bookmarks = [
+        _bookmark("Gardening tips"),
+        _bookmark("Python packaging"),
+        _bookmark("Recipes"),
+        _bookmark("Python asyncio guide"),
+    ]
+    shortlist = prefilter("python asyncio", bookmarks, k=2)
+    assert [bookmark.title for bookmark in shortlist] == [
+        "Python asyncio guide",
+        "Python packaging",
+    ]
+
+
+def test_prefilter_keeps_short_lists_unchanged():
+    bookmarks = [_bookmark("Recipes"), _bookmark("Gardening tips")]
+    assert prefilter("python", bookmarks, k=5) == bookmarks
+
+
+def test_ascii_fast_path_matches_the_regex():
+    text = "Foo - Bar -baz qux- --x-- a--b under_score C++ v1.2"
+    expected = ["foo", "bar", "baz", "qux", "x", "a--b", "under_score", "c", "v1", "2"]
+    assert tokenize(text) == expected
+    assert tokenize(text) == _TOKEN_RE.findall(text.lower())
@@ -0,0 +1,72 @@
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from fakes import fake_client, tab
+
+_PLAN = {
+    "prompt": "docs",
+    "bookmarks": [
+        {"title": "A", "url": "https://a.example"},
+        {"title": "B", "url": "https://b.example"},
+    ],
+}
+
+
+@pytest.fixture
+def stream_with():
+    def post(answers, *, json=_PLAN, **kwargs):
+        client = fake_client(answers, **kwargs)
+        main.app.dependency_overrides[main.get_llm_client] = lambda: client
+        return TestClient(main.app).post("/tabs/stream", json=json)
+
+    try:
+        yield post
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def _lines(response) -> list[dict]:
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+
+def test_suggestions_are_streamed_as_ndjson(stream_with):
+    response = stream_with(
+        lambda message: [tab("https://a.example"), tab("https://b.example")]
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content.endswith(b"\n")
+    assert _lines(response) == [
+        {"title": "A", "url": "https://a.example", "reason": "Relevant.", "score": 0.9},
+        {"title": "B", "url": "https://b.example", "reason": "Relevant.", "score": 0.9},
+    ]
+
+
+def test_invalid_request_is_a_400(stream_with):
+    response = stream_with(lambda message: [], json={**_PLAN, "prompt": "  "})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Prompt must not be empty."}
+
+
+def test_model_failure_before_the_first_line_is_a_502(stream_with):
+    response = stream_with(lambda message: [], fail=True)
+    assert response.status_code == 502
+    assert response.json()["detail"].startswith("OpenAI API request failed")
+
+
+def test_no_suggestions_is_a_502(stream_with):
+    response = stream_with(lambda message: [tab("https://invented.example")])
+    assert response.status_code == 502
+    assert response.json() == {"detail": "Language model returned no tab suggestions."}
+
+
+def test_failure_mid_stream_ends_with_an_error_line(stream_with):
+    response = stream_with(
+        lambda message: [tab("https://a.example")], fail_mid_stream=True
+    )
+    assert response.status_code == 200
+    first, last = _lines(response)
+    assert first["url"] == "https://a.example"
+    assert last == {"error": "OpenAI API request failed: connection reset"}